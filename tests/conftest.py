@@ -0,0 +1,5 @@
+# Run with: pip install -r requirements.txt pytest httpx && python -m pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,158 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+USER = main.User(id=1, email="owner@example.com", full_name="Owner", role="admin")
+
+PRODUCT_ROW = {
+    "id": 7, "user_id": 1, "name": "Sugar 1kg", "category_id": 2, "description": None,
+    "purchase_price": 3500.0, "selling_price": 4200.0, "stock": 12, "reorder_level": 5,
+    "unit": "pcs", "barcode": None, "created_at": datetime(2024, 1, 1, 9, 30),
+}
+
+SETTINGS_ROW = {
+    "user_id": 1, "business_name": "Duka", "currency": "UGX", "tax_rate": 18.0,
+    "low_stock_threshold": 5, "invoice_prefix": "INV", "purchase_prefix": "PUR",
+    "updated_at": datetime(2024, 1, 1, 9, 30),
+}
+
+
+class StubPool:
+    # Stands in for the asyncpg pool: every query gets the canned result for its method
+    def __init__(self):
+        self.fetchval_result = None
+        self.fetch_result = []
+        self.fetchrow_result = None
+        self.queries = []
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        return self.fetchval_result
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return self.fetch_result
+
+    async def fetchrow(self, query, *args):
+        self.queries.append(query)
+        return self.fetchrow_result
+
+
+@pytest.fixture
+def pool():
+    # No `with TestClient(...)`, so the startup hook never opens a real pool
+    stub = StubPool()
+    main.app.state.pool = stub
+    main._settings_cache.clear()
+    main._activities_cache.clear()
+    main._token_cache.clear()
+    yield stub
+    main.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(pool):
+    main.app.dependency_overrides[main.get_current_active_user] = lambda: USER
+    return TestClient(main.app)
+
+
+def column_names(columns: str):
+    return {column.strip().split(" AS ")[-1].split("::")[0] for column in columns.split(",")}
+
+
+def test_products_keys(client, pool):
+    pool.fetchval_result = 3
+    pool.fetch_result = [PRODUCT_ROW]
+
+    response = client.get("/products")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == 'W/"1-3"'
+    [product] = response.json()
+    assert set(product) == column_names(main.PRODUCT_COLUMNS) == set(main.Product.__fields__)
+
+
+def test_products_not_modified(client, pool):
+    pool.fetchval_result = 3
+
+    response = client.get("/products", headers={"If-None-Match": 'W/"1-3"'})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"1-3"'
+    assert len(pool.queries) == 1  # only the version lookup, no row fetch
+
+
+def test_settings_keys_use_aliases(client, pool):
+    pool.fetchrow_result = SETTINGS_ROW
+
+    response = client.get("/settings")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": 1, "businessName": "Duka", "currency": "UGX", "taxRate": 18.0,
+        "lowStockThreshold": 5, "invoicePrefix": "INV", "purchasePrefix": "PUR",
+    }
+
+
+def test_settings_not_modified(client, pool):
+    pool.fetchrow_result = SETTINGS_ROW
+    etag = client.get("/settings").headers["etag"]
+
+    response = client.get("/settings", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_cookie_only_write_is_rejected(pool):
+    token = main.create_access_token({"sub": USER.email})
+    client = TestClient(main.app, cookies={"access_token": token})
+
+    response = client.post("/products", json={})
+
+    assert response.status_code == 401
+    assert pool.queries == []
+
+
+def test_cookie_allowed_for_reads(pool):
+    token = main.create_access_token({"sub": USER.email})
+    client = TestClient(main.app, cookies={"access_token": token})
+    pool.fetchrow_result = {**USER.dict(), "hashed_password": "x"}
+    pool.fetchval_result = 0
+
+    response = client.get("/products")
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("payload", [
+    b'{"products": "nope"}',
+    b'{"products": [{"id": 1}]}',
+    b'{"last_sync_time": "not a date"}',
+    b'{"last_sync_time": 1e999}',
+    b'not json',
+])
+def test_sync_rejects_bad_payloads(client, pool, payload):
+    response = client.post("/sync", content=payload)
+
+    assert response.status_code == 422
+    assert pool.queries == []
+
+
+@pytest.mark.parametrize("last_sync_time", [
+    '"2024-01-01T10:00"',
+    '"2024-01-01T10:00:00Z"',
+    "1700000000",
+    "1700000000000",
+    "1700000000000000",
+])
+def test_sync_accepts_loose_timestamps(client, pool, last_sync_time):
+    pool.fetchval_result = '{"products": [], "sync_cursor": 5}'
+
+    response = client.post("/sync", content=f'{{"last_sync_time": {last_sync_time}}}')
+
+    assert response.status_code == 200
+    assert response.json() == {"products": [], "sync_cursor": 5}